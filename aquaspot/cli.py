@@ -5,6 +5,7 @@ Provides CLI commands for pipeline leak detection operations.
 """
 
 import logging
+from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 
@@ -25,7 +26,91 @@ def main(verbose: bool) -> None:
         logger.debug("Verbose logging enabled")
 
 
-@main.command()
+def ingest(
+    geojson: Path,
+    date: datetime,
+    output: Path | None = None,
+    days_tolerance: int = 7,
+    max_cloud_cover: float = 20.0,
+    on_download: Callable[[Path], None] | None = None,
+) -> list[Path]:
+    """
+    Download Sentinel-2 imagery for a pipeline and date.
+
+    Args:
+        geojson: Path to pipeline GeoJSON file
+        date: Target date for imagery
+        output: Output directory (default: DATA_DIR)
+        days_tolerance: Days before/after target date to search
+        max_cloud_cover: Maximum cloud cover percentage (0-100)
+        on_download: Called with each tile path as soon as it is on disk
+
+    Returns:
+        List of paths to downloaded tile files
+
+    Raises:
+        ValueError: If the GeoJSON or date is invalid
+        ConnectionError: If imagery could not be downloaded
+        RuntimeError: If no suitable imagery found
+    """
+    from .ingestion import download_sentinel_tiles, load_pipeline_geojson
+
+    logger.info(f"Starting ingestion for {geojson.name} on {date.strftime('%Y-%m-%d')}")
+
+    out_dir = output or config.data_dir
+
+    # Load pipeline geometry and create AOI
+    logger.info("Loading pipeline geometry...")
+    aoi = load_pipeline_geojson(geojson)
+
+    # Download imagery
+    logger.info("Searching for Sentinel-2 imagery...")
+    return download_sentinel_tiles(
+        aoi=aoi,
+        date=date,
+        out_dir=out_dir,
+        days_tolerance=days_tolerance,
+        max_cloud_cover=max_cloud_cover,
+        on_download=on_download,
+    )
+
+
+def detect(
+    baseline: Path,
+    current: Path,
+    pipeline: Path,
+    output: Path | None = None,
+) -> list[Path]:
+    """
+    Run leak detection analysis on a baseline/current image pair.
+
+    Args:
+        baseline: Path to baseline imagery
+        current: Path to current imagery
+        pipeline: Path to pipeline GeoJSON
+        output: Output directory (default: DATA_DIR/results)
+
+    Returns:
+        List of paths to generated change-map files
+
+    Raises:
+        NotImplementedError: Detection workflow is not implemented yet
+    """
+    logger.info(f"Starting detection: baseline={baseline}, current={current}")
+
+    if output is None:
+        output = config.data_dir / "results"
+
+    # TODO: Implement detection workflow
+    # TODO: Calculate NDWI for both images
+    # TODO: Apply masking and change detection
+    # TODO: Generate candidates and reports
+
+    msg = "Detection command not yet implemented"
+    raise NotImplementedError(msg)
+
+
+@main.command(name="ingest")
 @click.option(
     "--geojson",
     required=True,
@@ -57,7 +142,7 @@ def main(verbose: bool) -> None:
     default=20.0,
     help="Maximum cloud cover percentage (default: 20)",
 )
-def ingest(
+def ingest_command(
     geojson: Path,
     date: datetime,
     output: Path | None,
@@ -65,43 +150,33 @@ def ingest(
     max_cloud_cover: float,
 ) -> None:
     """Download Sentinel-2 imagery for pipeline monitoring."""
-    from .ingestion import download_sentinel_tiles, load_pipeline_geojson
-
-    logger.info(f"Starting ingestion for {geojson.name} on {date.strftime('%Y-%m-%d')}")
     click.echo(f"Ingestion started for {geojson.name} on {date.strftime('%Y-%m-%d')}")
-    
+
     # Set output directory
     out_dir = output or config.data_dir
     click.echo(f"Output directory: {out_dir}")
-    
+
     try:
-        # Load pipeline geometry and create AOI
-        logger.info("Loading pipeline geometry...")
-        aoi = load_pipeline_geojson(geojson)
-        
-        # Download imagery
-        logger.info("Searching for Sentinel-2 imagery...")
-        downloaded_files = download_sentinel_tiles(
-            aoi=aoi,
+        downloaded_files = ingest(
+            geojson=geojson,
             date=date,
-            out_dir=out_dir,
+            output=out_dir,
             days_tolerance=days_tolerance,
             max_cloud_cover=max_cloud_cover,
         )
-        
-        click.echo(f"\n[SUCCESS] Successfully downloaded {len(downloaded_files)} files:")
-        for file_path in downloaded_files:
-            click.echo(f"  - {file_path}")
-            
-        click.echo(f"\n[INFO] Files saved to: {out_dir / date.strftime('%Y-%m-%d')}")
-        
     except Exception as e:
         logger.error(f"Ingestion failed: {e}")
         click.echo(f"\n[ERROR] Ingestion failed: {e}")
         raise click.ClickException(str(e))
 
+    click.echo(f"\n[SUCCESS] Successfully downloaded {len(downloaded_files)} files:")
+    for file_path in downloaded_files:
+        click.echo(f"  - {file_path}")
 
-@main.command()
+    click.echo(f"\n[INFO] Files saved to: {out_dir / date.strftime('%Y-%m-%d')}")
+
+
+@main.command(name="detect")
 @click.option(
     "--baseline",
     required=True,
@@ -127,24 +202,18 @@ def ingest(
     default=None,
     help="Output directory",
 )
-def detect(baseline: Path, current: Path, pipeline: Path, output: Path | None) -> None:
+def detect_command(
+    baseline: Path,
+    current: Path,
+    pipeline: Path,
+    output: Path | None,
+) -> None:
     """Run leak detection analysis."""
-    logger.info(f"Starting detection: baseline={baseline}, current={current}")
-
-    if output is None:
-        output = config.data_dir / "results"
-
-    # TODO: Implement detection workflow
-    # TODO: Calculate NDWI for both images
-    # TODO: Apply masking and change detection
-    # TODO: Generate candidates and reports
-
     click.echo(f"Detection started for {baseline} vs {current}")
     click.echo(f"Pipeline: {pipeline}")
-    click.echo(f"Output: {output}")
+    click.echo(f"Output: {output or config.data_dir / 'results'}")
 
-    msg = "Detection command not yet implemented"
-    raise NotImplementedError(msg)
+    detect(baseline, current, pipeline, output)
 
 
 if __name__ == "__main__":
@@ -9,7 +9,7 @@ import logging
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import geopandas as gpd
 import planetary_computer as pc
@@ -29,6 +29,7 @@ def download_sentinel_tiles(
     days_tolerance: int = 7,
     max_cloud_cover: float = 20.0,
     max_retries: int = 3,
+    on_download: Optional[Callable[[Path], None]] = None,
 ) -> list[Path]:
     """
     Download Sentinel-2 tiles for given area of interest and date.
@@ -40,6 +41,7 @@ def download_sentinel_tiles(
         days_tolerance: Days before/after target date to search
         max_cloud_cover: Maximum cloud cover percentage (0-100)
         max_retries: Maximum number of retry attempts
+        on_download: Called with each tile path as soon as it is on disk
 
     Returns:
         List of paths to downloaded tile files
@@ -89,6 +91,8 @@ def download_sentinel_tiles(
                     if downloaded_file:
                         downloaded_files.append(downloaded_file)
                         logger.info(f"Downloaded: {downloaded_file.name}")
+                        if on_download is not None:
+                            on_download(downloaded_file)
                 except Exception as e:
                     logger.warning(f"Failed to download item {item.id}: {e}")
                     continue
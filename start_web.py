@@ -51,11 +51,12 @@ def main():
     
     # Start the Flask app
     os.environ['FLASK_APP'] = 'app.py'
-    os.environ['FLASK_ENV'] = 'development'
+    debug = os.environ.get('AQUASPOT_DEBUG', '').lower() in ('1', 'true', 'yes')
+    os.environ['FLASK_ENV'] = 'development' if debug else 'production'
     
     try:
         from app import app
-        app.run(debug=True, host='0.0.0.0', port=5000)
+        app.run(debug=debug, host='0.0.0.0', port=5000, threaded=True)
     except KeyboardInterrupt:
         print("\n\n👋 AquaSpot web interface stopped.")
     except Exception as e:
@@ -0,0 +1,357 @@
+"""Test the web application helpers."""
+
+import errno
+import io
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def queued(monkeypatch, tmp_path):
+    """Queue analyses as never-finishing futures in a temp uploads folder."""
+    monkeypatch.setattr(app, "UPLOAD_FOLDER", tmp_path)
+    monkeypatch.setattr(app, "JOBS", {})
+    monkeypatch.setattr(app, "REPORT_JOBS", {})
+    monkeypatch.setattr(app, "ANALYSIS_CACHE", {})
+    monkeypatch.setattr(app, "submit_job", lambda fn, *args: Future())
+    return tmp_path
+
+
+def start(body, filename="pipeline.geojson"):
+    """Spool ``body`` as an upload and start its analysis."""
+    spool = app.open_upload_spool()
+    try:
+        spool.write(body)
+        spool.flush()
+        return app.start_analysis(spool, filename, datetime(2024, 5, 1), 5)
+    finally:
+        spool.close()
+
+
+def test_encode_report_ascii_mode(monkeypatch):
+    """Test ASCII mode transliterates symbols and drops decorative emoji."""
+    monkeypatch.setattr(app, "ASCII_REPORTS", True)
+
+    text = (
+        "🚨 CRITICAL ALERT 🚨\n"
+        "PRIORITY: CRITICAL ⚠️\n"
+        "Status: LOW ✅\n"
+        "• Window: ±5 days → 33.8°N\n"
+    )
+
+    assert app.encode_report(text) == (
+        b"CRITICAL ALERT\n"
+        b"PRIORITY: CRITICAL [!]\n"
+        b"Status: LOW [OK]\n"
+        b"* Window: +/-5 days -> 33.8N\n"
+    )
+
+
+def test_encode_report_default_keeps_unicode(monkeypatch):
+    """Test reports are plain UTF-8 unless ASCII mode is on."""
+    monkeypatch.setattr(app, "ASCII_REPORTS", False)
+
+    assert app.encode_report("LOW ✅\n") == "LOW ✅\n".encode("utf-8")
+
+
+def test_start_analysis_gives_each_upload_its_own_job(queued):
+    """Test same-named uploads get distinct jobs and upload copies."""
+    first = start(b'{"a": 1}')
+    second = start(b'{"a": 2}')
+
+    assert first != second
+    assert (queued / first / "pipeline.geojson").read_bytes() == b'{"a": 1}'
+    assert (queued / second / "pipeline.geojson").read_bytes() == b'{"a": 2}'
+
+
+def test_analysis_cache_evicts_least_recently_used(queued, monkeypatch):
+    """Test a reused analysis is kept over older entries on eviction."""
+    monkeypatch.setattr(app, "ANALYSIS_CACHE_SIZE", 2)
+    first = start(b'{"a": 1}')
+    second = start(b'{"a": 2}')
+
+    assert start(b'{"a": 1}') == first
+    start(b'{"a": 3}')
+
+    assert start(b'{"a": 1}') == first
+    assert start(b'{"a": 2}') != second
+
+
+def test_start_analysis_forgets_oldest_finished_jobs(queued, monkeypatch):
+    """Test finished jobs are pruned oldest first and pending ones kept."""
+    monkeypatch.setattr(app, "JOBS_SIZE", 2)
+    first = start(b'{"a": 1}')
+    second = start(b'{"a": 2}')
+    app.JOBS[first].set_result({})
+    app.REPORT_JOBS[first] = Future()
+
+    # The first job's report is still pending, so nothing can be dropped
+    third = start(b'{"a": 3}')
+    assert list(app.JOBS) == [first, second, third]
+
+    app.REPORT_JOBS[first].set_result({})
+    app.JOBS[third].set_result({})
+    fourth = start(b'{"a": 4}')
+    assert list(app.JOBS) == [second, fourth]
+    assert app.REPORT_JOBS == {}
+
+
+VALID_GEOJSON = (
+    b'{"type": "FeatureCollection", "features": [{"type": "Feature", '
+    b'"properties": {}, "geometry": {"type": "LineString", '
+    b'"coordinates": [[-95.37, 29.76], [-95.36, 29.75]]}}]}'
+)
+
+
+@pytest.fixture
+def client(queued):
+    """Flask test client whose analyses are queued but never run."""
+    app.app.config["TESTING"] = True
+    return app.app.test_client()
+
+
+def test_validate_geojson_stream_counts_geometries():
+    """Test the streaming validator accepts pipeline geometries."""
+    assert app.validate_geojson_stream(io.BytesIO(VALID_GEOJSON)) == 1
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        (b'{"type": "Topology"}', "Unsupported GeoJSON type"),
+        (b'{"type": "Feature", "geometry": {"type": "Point"}}', "Unsupported geometry type"),
+        (b'{"type": "FeatureCollection", "features": []}', "No pipeline geometries"),
+        (b'{"type": "FeatureCollection", "features": [', "Malformed JSON"),
+    ],
+)
+def test_validate_geojson_stream_rejects_invalid(body, message):
+    """Test the streaming validator rejects non-pipeline or broken JSON."""
+    with pytest.raises(ValueError, match=message) as excinfo:
+        app.validate_geojson_stream(io.BytesIO(body))
+
+    assert "\n" not in str(excinfo.value)
+
+
+def test_upload_valid_geojson_starts_analysis(client, queued):
+    """Test a valid multipart upload is published and queued."""
+    response = client.post(
+        "/upload",
+        data={
+            "geojson_file": (io.BytesIO(VALID_GEOJSON), "pipeline.geojson"),
+            "target_date": "2024-05-01",
+            "days_tolerance": "5",
+        },
+    )
+
+    assert response.status_code == 302
+    (timestamp,) = app.JOBS
+    assert f"/status/{timestamp}" in response.location
+    assert (queued / timestamp / "pipeline.geojson").read_bytes() == VALID_GEOJSON
+
+
+def test_upload_invalid_geojson_is_rejected(client, queued):
+    """Test an invalid upload is refused without queuing or publishing."""
+    response = client.post(
+        "/upload",
+        data={
+            "geojson_file": (io.BytesIO(b'{"type": "Topology"}'), "pipeline.geojson"),
+            "target_date": "2024-05-01",
+        },
+    )
+
+    assert response.status_code == 302
+    assert not app.JOBS
+    assert not any(queued.iterdir())
+
+
+def test_upload_too_large_returns_413(client, monkeypatch):
+    """Test uploads over MAX_CONTENT_LENGTH get a 413."""
+    monkeypatch.setitem(app.app.config, "MAX_CONTENT_LENGTH", 64)
+    response = client.post(
+        "/upload",
+        data={
+            "geojson_file": (io.BytesIO(VALID_GEOJSON), "pipeline.geojson"),
+            "target_date": "2024-05-01",
+        },
+    )
+
+    assert response.status_code == 413
+    assert not app.JOBS
+
+
+def test_upload_stream_valid_geojson_is_accepted(client, queued):
+    """Test a raw-body upload is queued and answered with 202."""
+    response = client.post(
+        "/upload_stream?filename=pipeline.geojson&target_date=2024-05-01",
+        data=VALID_GEOJSON,
+    )
+
+    assert response.status_code == 202
+    timestamp = response.get_json()["timestamp"]
+    assert (queued / timestamp / "pipeline.geojson").read_bytes() == VALID_GEOJSON
+
+
+def test_upload_stream_invalid_geojson_is_rejected(client):
+    """Test a malformed raw-body upload gets a one-line 400 error."""
+    response = client.post(
+        "/upload_stream?filename=pipeline.geojson&target_date=2024-05-01",
+        data=b'{"type": "FeatureCollection", "features": [',
+    )
+
+    assert response.status_code == 400
+    assert "\n" not in response.get_json()["error"]
+    assert not app.JOBS
+
+
+def test_upload_stream_chunked_too_large_returns_413(client, monkeypatch):
+    """Test a chunked body over the limit gets a 413, not a 500."""
+    monkeypatch.setitem(app.app.config, "MAX_CONTENT_LENGTH", 64)
+    response = client.post(
+        "/upload_stream?filename=pipeline.geojson&target_date=2024-05-01",
+        input_stream=io.BytesIO(VALID_GEOJSON),
+        headers={"Transfer-Encoding": "chunked"},
+        environ_base={"wsgi.input_terminated": True},
+    )
+
+    assert response.status_code == 413
+    assert not app.JOBS
+
+
+def test_publish_upload_links_spool(queued):
+    """Test a spooled upload is published with its full contents."""
+    spool = app.open_upload_spool()
+    spool.write(VALID_GEOJSON)
+    spool.flush()
+    target = queued / "pipeline.geojson"
+
+    app.publish_upload(spool, target)
+    spool.close()
+
+    assert target.read_bytes() == VALID_GEOJSON
+
+
+def test_publish_upload_copies_when_link_fails(queued, monkeypatch):
+    """Test the copy fallback when the spool cannot be linked (e.g. EXDEV)."""
+    def cross_device(*args, **kwargs):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(app.os, "link", cross_device)
+    monkeypatch.setattr(app, "UPLOAD_COPY_SIZE", 16)
+    spool = app.open_upload_spool()
+    spool.write(VALID_GEOJSON)
+    spool.flush()
+    target = queued / "pipeline.geojson"
+
+    app.publish_upload(spool, target)
+    spool.close()
+
+    assert target.read_bytes() == VALID_GEOJSON
+
+
+def test_publish_upload_copies_streams_without_fileno(queued):
+    """Test in-memory streams are copied into place."""
+    target = queued / "pipeline.geojson"
+
+    app.publish_upload(io.BytesIO(VALID_GEOJSON), target)
+
+    assert target.read_bytes() == VALID_GEOJSON
+
+
+def test_run_analysis_discards_pairs_split_by_later_tiles(monkeypatch, tmp_path):
+    """Test out-of-order tiles leave change maps only for consecutive pairs."""
+    monkeypatch.setattr(app, "RESULTS_FOLDER", tmp_path)
+    first_detection = threading.Event()
+    compared = []
+
+    def fake_ingest(geojson, date, output, days_tolerance, on_download):
+        tiles = []
+        for day in ("01", "05", "03"):
+            tile = output / "2024-05-01" / f"S2_2024-05-{day}.tif"
+            tile.parent.mkdir(parents=True, exist_ok=True)
+            tile.write_bytes(b"tile")
+            tiles.append(tile)
+            on_download(tile)
+            if day == "05":
+                # Let the 01->05 comparison finish before 03 splits it
+                first_detection.wait(timeout=5)
+        return tiles
+
+    def fake_detect(baseline, current, pipeline, output):
+        compared.append((Path(baseline).name, Path(current).name))
+        output.mkdir(parents=True)
+        change_map = output / "change_map.tif"
+        change_map.write_bytes(b"change")
+        first_detection.set()
+        return [change_map]
+
+    monkeypatch.setattr(app, "cli_ingest", fake_ingest)
+    monkeypatch.setattr(app, "cli_detect", fake_detect)
+    geojson = tmp_path / "pipeline.geojson"
+    geojson.write_bytes(VALID_GEOJSON)
+
+    summary = app.run_analysis(geojson, datetime(2024, 5, 1), 5, "test")
+
+    assert ("S2_2024-05-01.tif", "S2_2024-05-05.tif") in compared
+    assert summary["num_images"] == 3
+    assert summary["num_changes"] == 2
+    detection_dir = tmp_path / "analysis_test" / app.DETECTION_DIR
+    assert len(list(detection_dir.glob("*/change_map.tif"))) == 2
+
+
+def report_data(num_changes):
+    """Shared report inputs for an analysis with ``num_changes`` anomalies."""
+    data = app.analysis_data(
+        datetime(2024, 5, 1),
+        5,
+        Path("pipeline.geojson"),
+        ["S2_2024-05-01.tif", "S2_2024-05-06.tif"],
+        [f"change_map_{i}.tif" for i in range(num_changes)],
+    )
+    data["analysis_date"] = datetime(2024, 5, 2, 12, 30, tzinfo=app.UTC)
+    return data
+
+
+@pytest.mark.parametrize(
+    "num_changes, soil, groundwater, surface_water",
+    [(0, "LOW", "LOW", "LOW"), (3, "HIGH", "MEDIUM", "HIGH")],
+)
+def test_risk_assessment_fills_risk_levels(tmp_path, num_changes, soil, groundwater, surface_water):
+    """Test the risk matrix prints levels rather than their expressions."""
+    app.create_risk_assessment(tmp_path, report_data(num_changes))
+
+    report = (tmp_path / "RISK_ASSESSMENT_MATRIX.txt").read_text(encoding="utf-8")
+    assert f"Soil Contamination: {soil} Risk\n" in report
+    assert f"Groundwater Impact: {groundwater} Risk\n" in report
+    assert f"Surface Water Impact: {surface_water} Risk\n" in report
+    assert "{" not in report
+
+
+def test_no_anomaly_summary_matches_fresh_render():
+    """Test the prerendered no-anomaly skeleton fills in like a full render."""
+    data = report_data(0)
+    context = app.executive_summary_context(data, data["analysis_date"])
+
+    assert app.render_executive_summary(data) == app.render_report("executive.txt.j2", context)
+
+
+@pytest.mark.parametrize("num_changes", [0, 3])
+@pytest.mark.parametrize(
+    "create_report, filename, template_name",
+    [
+        (app.create_trend_analysis, "TREND_ANALYSIS_REPORT.txt", "trend.txt.j2"),
+        (app.create_maintenance_recommendations, "MAINTENANCE_RECOMMENDATIONS.txt", "maintenance.txt.j2"),
+        (app.create_emergency_protocols, "EMERGENCY_RESPONSE_PROTOCOLS.txt", "emergency.txt.j2"),
+    ],
+)
+def test_prerendered_reports_match_fresh_render(tmp_path, num_changes, create_report, filename, template_name):
+    """Test the prerendered report variants match rendering the template now."""
+    data = report_data(num_changes)
+    create_report(tmp_path, data)
+
+    assert (tmp_path / filename).read_bytes() == app.render_report(template_name, data)
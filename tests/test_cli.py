@@ -1,8 +1,9 @@
 """Test CLI module."""
 
+import pytest
 from click.testing import CliRunner
 
-from aquaspot.cli import main
+from aquaspot.cli import detect, main
 
 
 def test_cli_help():
@@ -56,3 +57,14 @@ def test_detect_command_not_implemented():
 
         # Should show the error message about not being implemented
         assert result.exit_code != 0
+
+
+def test_detect_function_not_implemented(tmp_path):
+    """Test in-process detect function raises NotImplementedError."""
+    with pytest.raises(NotImplementedError):
+        detect(
+            tmp_path / "baseline.tif",
+            tmp_path / "current.tif",
+            tmp_path / "pipeline.geojson",
+            output=tmp_path / "results",
+        )
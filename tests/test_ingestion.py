@@ -43,3 +43,21 @@ def test_download_sentinel_tiles_logging(caplog):
 
     # Check that debug logging occurred
     assert "Starting tile download for AOI bounds:" in caplog.text
+
+
+def test_download_sentinel_tiles_reports_each_download(tmp_path):
+    """Test on_download is called with each tile as it is downloaded."""
+    aoi = shapely.geometry.box(0, 0, 1, 1)
+    date = datetime(2024, 5, 1)
+    items = [type("Item", (), {"id": f"scene{i}"})() for i in range(2)]
+
+    def fake_download(item, output_dir, index):
+        return output_dir / f"{item.id}.tif"
+
+    seen = []
+    with patch("aquaspot.ingestion._search_sentinel2_imagery", return_value=items), \
+            patch("aquaspot.ingestion._download_sentinel2_item", side_effect=fake_download):
+        files = download_sentinel_tiles(aoi, date, tmp_path, on_download=seen.append)
+
+    assert seen == files
+    assert [f.name for f in files] == ["scene0.tif", "scene1.tif"]
@@ -1,10 +1,15 @@
 """
 WSGI entry point for AquaSpot web application.
 
-This file is used by production servers like Gunicorn to run the Flask app.
+This file is used by production servers like Gunicorn to run the Flask app:
+
+    gunicorn wsgi:application --workers 1 --worker-class gthread --threads 4 --timeout 600
+
+Analysis jobs are tracked in memory by the worker that accepted the upload,
+so scale request concurrency with --threads rather than --workers. For local
+development use start_web.py instead.
 """
 
 from app import app
 
-if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+application = app